@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import os
+
+# Content hashes of files already processed, keyed by "<script>@<fingerprint>:<path>"
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.fix_cache.json')
+
+def script_fingerprint(*sources):
+    """Short hash of the sources defining a script's transform; edits invalidate old entries"""
+    sha1 = hashlib.sha1()
+    for source in sources:
+        with open(source, 'rb') as f:
+            sha1.update(f.read())
+    return sha1.hexdigest()[:12]
+
+def cache_key(script_name, fingerprint, path):
+    """Cache key for a file processed by a given version of a fix script"""
+    return f'{script_name}@{fingerprint}:{path}'
+
+def prune_cache(cache, script_name, fingerprint):
+    """Drop entries recorded by other (or unversioned) builds of a fix script"""
+    current = f'{script_name}@{fingerprint}:'
+    for key in list(cache):
+        owner = key.partition(':')[0].partition('@')[0]
+        if owner == script_name and not key.startswith(current):
+            del cache[key]
+
+def load_cache():
+    """Load the hash cache, or an empty one if it is missing or unreadable"""
+    try:
+        with open(CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(cache):
+    """Persist the hash cache after a successful run"""
+    with open(CACHE_FILE, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
@@ -1,83 +1,136 @@
 #!/usr/bin/env python3
 
+import hashlib
 import os
-import subprocess
-import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
 
-def fix_single_object_tests():
-    """Fix all remaining single object tests to wrap responses in ApiResponse<>'"""
-    
-    # List of files that need fixing for single objects
-    files_to_check = [
-        'TaskStatusesClientTests.cs',
-        'EventTypesClientTests.cs', 
-        'MatterSubStatusesClientTests.cs',
-        'SubtasksClientTests.cs',
-        'ExpensesClientTests.cs',
-        'TasksClientTests.cs',
-        'TimeEntriesClientTests.cs'
-    ]
-    
-    # Object types for each file
-    object_types = {
-        'TaskStatusesClientTests.cs': 'LawMatics.SDK.Models.TaskStatus',
-        'EventTypesClientTests.cs': 'EventType',
-        'MatterSubStatusesClientTests.cs': 'MatterSubStatus', 
-        'SubtasksClientTests.cs': 'Subtask',
-        'ExpensesClientTests.cs': 'Expense',
-        'TasksClientTests.cs': 'TaskItem',
-        'TimeEntriesClientTests.cs': 'TimeEntry'
-    }
-    
-    total_fixes = 0
-    
-    for filename in files_to_check:
-        filepath = f'/workspace/LawMatics.SDK.Tests/{filename}'
-        if os.path.exists(filepath):
-            print(f"Checking {filename}...")
-            
-            # Find lines that still have direct expectedResponse serialization (not already fixed)
-            result = subprocess.run([
-                'grep', '-n', 'JsonSerializer.Serialize(expectedResponse, _jsonOptions)', filepath
-            ], capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                for line in lines:
-                    if line.strip():
-                        line_num = int(line.split(':')[0])
-                        print(f"  Found unfixed serialization at line {line_num}")
-                        
-                        # Check what type this is by looking backwards
-                        check_result = subprocess.run([
-                            'sed', '-n', f'1,{line_num}p', filepath
-                        ], capture_output=True, text=True)
-                        
-                        content = check_result.stdout
-                        
-                        # Look for the expectedResponse declaration
-                        if 'new PagedResponse<' in content:
-                            print(f"  -> Skipping - this is a PagedResponse (already fixed)")
-                        elif 'var expectedResponse = new ' in content:
-                            # This is a single object - fix it
-                            object_type = object_types.get(filename, 'Unknown')
-                            print(f"  -> Single object {object_type} found, adding ApiResponse wrapper")
-                            
-                            # Fix the line
-                            replacement = f'var apiResponse = new ApiResponse<{object_type}> {{ Data = expectedResponse }};\\n               var jsonResponse = JsonSerializer.Serialize(apiResponse, _jsonOptions);'
-                            subprocess.run([
-                                'sed', '-i', f'{line_num}s/var jsonResponse = JsonSerializer.Serialize(expectedResponse, _jsonOptions);/{replacement}/', filepath
-                            ])
-                            total_fixes += 1
-                        else:
-                            print(f"  -> Could not determine expectedResponse type")
-            else:
-                print(f"  No unfixed expectedResponse serialization found")
+import fix_utils
+from _cache import cache_key, load_cache, prune_cache, save_cache, script_fingerprint
+from fix_utils import SERIALIZE_RE, declaration_at, declaration_index
+
+SCRIPT_NAME = os.path.basename(__file__)
+SCRIPT_FINGERPRINT = script_fingerprint(__file__, fix_utils.__file__)
+TESTS_DIR = '/workspace/LawMatics.SDK.Tests'
+
+# Object types for each file that needs fixing for single objects
+OBJECT_TYPES = {
+    'TaskStatusesClientTests.cs': 'LawMatics.SDK.Models.TaskStatus',
+    'EventTypesClientTests.cs': 'EventType',
+    'MatterSubStatusesClientTests.cs': 'MatterSubStatus',
+    'SubtasksClientTests.cs': 'Subtask',
+    'ExpensesClientTests.cs': 'Expense',
+    'TasksClientTests.cs': 'TaskItem',
+    'TimeEntriesClientTests.cs': 'TimeEntry'
+}
+
+def find_test_files():
+    """Names of the *ClientTests.cs files in the tests directory, in one scan"""
+    with os.scandir(TESTS_DIR) as entries:
+        return {entry.name for entry in entries
+                if entry.is_file() and entry.name.endswith('ClientTests.cs')}
+
+def fix_single_object_file(filename, cache):
+    """Fix one test file; returns (fixes applied, log lines, content hash, skipped)"""
+
+    filepath = f'{TESTS_DIR}/{filename}'
+    log = []
+    fixes = 0
+
+    log.append(f"Checking {filename}...")
+
+    # Whole-file bytes I/O: one read/write call and no newline translation
+    content = Path(filepath).read_bytes()
+    digest = hashlib.sha1(content).hexdigest()
+
+    # Nothing to do if the file is exactly as this script last left it
+    if cache.get(cache_key(SCRIPT_NAME, SCRIPT_FINGERPRINT, filepath)) == digest:
+        log.append(f"  Unchanged since last run, skipping")
+        return fixes, log, digest, True
+
+    # Most files are already fixed; skip the regex work for them entirely
+    if b'JsonSerializer.Serialize(expectedResponse' not in content:
+        log.append(f"  No unfixed expectedResponse serialization found")
+        return fixes, log, digest, False
+
+    # Index every expectedResponse declaration once so each serialization
+    # can look up the nearest preceding one without rescanning the file
+    declarations = declaration_index(content)
+
+    # Line numbers are only needed for the log; count newlines incrementally
+    line_pos = 0
+    line_num = 1
+
+    def wrap_serialization(match):
+        nonlocal fixes, line_pos, line_num
+
+        line_num += content.count(b'\n', line_pos, match.start())
+        line_pos = match.start()
+        log.append(f"  Found unfixed serialization at line {line_num}")
+
+        declared_type = declaration_at(declarations, match.start())
+        if declared_type is None:
+            log.append(f"  -> Could not determine expectedResponse type")
+            return match.group(0)
+
+        if declared_type.startswith(b'PagedResponse<'):
+            # Wrap with the declared generic argument rather than an empty PagedResponse<>
+            object_type = declared_type.decode('ascii')
+            log.append(f"  -> {object_type} found, adding ApiResponse wrapper")
         else:
+            # This is a single object - fix it
+            object_type = OBJECT_TYPES.get(filename, 'Unknown')
+            log.append(f"  -> Single object {object_type} found, adding ApiResponse wrapper")
+
+        fixes += 1
+        return (f'var apiResponse = new ApiResponse<{object_type}> {{ Data = expectedResponse }};\n'
+                f'               var jsonResponse = JsonSerializer.Serialize(apiResponse, _jsonOptions);').encode('ascii')
+
+    new_content, found = SERIALIZE_RE.subn(wrap_serialization, content)
+
+    if not found:
+        log.append(f"  No unfixed expectedResponse serialization found")
+    elif fixes:
+        Path(filepath).write_bytes(new_content)
+        digest = hashlib.sha1(new_content).hexdigest()
+
+    return fixes, log, digest, False
+
+def fix_single_object_tests():
+    """Fix all remaining single object and paged tests to wrap responses in ApiResponse<>"""
+
+    if not os.path.isdir(TESTS_DIR):
+        print(f"Tests directory {TESTS_DIR} not found")
+        return
+
+    # Only the files whose responses are wrapped in ApiResponse<> are fixed
+    test_files = find_test_files()
+    files_to_check = [filename for filename in OBJECT_TYPES if filename in test_files]
+    cache = load_cache()
+
+    # Each file is independent, so check them concurrently and report in order
+    with ThreadPoolExecutor(max_workers=min(8, max(1, len(files_to_check)))) as executor:
+        results = list(executor.map(partial(fix_single_object_file, cache=cache), files_to_check))
+
+    results_by_file = dict(zip(files_to_check, results))
+    for filename in OBJECT_TYPES:
+        if filename not in results_by_file:
             print(f"File {filename} not found")
-    
+            continue
+        _, log, digest, _ = results_by_file[filename]
+        print('\n'.join(log))
+        cache[cache_key(SCRIPT_NAME, SCRIPT_FINGERPRINT, f'{TESTS_DIR}/{filename}')] = digest
+
+    prune_cache(cache, SCRIPT_NAME, SCRIPT_FINGERPRINT)
+    save_cache(cache)
+
+    total_fixes = sum(fixes for fixes, _, _, _ in results)
+    skipped = sum(was_skipped for _, _, _, was_skipped in results)
+
     print(f"\n=== Summary ===")
-    print(f"Total single object fixes applied: {total_fixes}")
+    print(f"Total ApiResponse wrapper fixes applied: {total_fixes}")
+    print(f"Unchanged files skipped: {skipped}")
 
 if __name__ == "__main__":
     fix_single_object_tests()
\ No newline at end of file
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+import re
+from bisect import bisect_right
+
+# Patterns shared by the fix scripts, compiled once per interpreter
+# The type is only captured when it runs up to the initializer's ( or {;
+# otherwise (or when its generics don't balance) the declaration is unknown
+DECL_RE = re.compile(rb'var expectedResponse = new\b(?:\s+(?P<type>[\w.]+(?:<[\w.<>, ]*>)?)\s*[({])?')
+
+# Direct expectedResponse serialization (not already fixed)
+SERIALIZE_RE = re.compile(rb'var jsonResponse = JsonSerializer\.Serialize\(expectedResponse, _jsonOptions\);')
+
+def declaration_index(content):
+    """Sorted (end offset, type) pairs for every expectedResponse declaration in bytes content"""
+    declarations = []
+    for m in DECL_RE.finditer(content):
+        declared_type = m.group('type')
+        if declared_type is not None and declared_type.count(b'<') != declared_type.count(b'>'):
+            declared_type = None
+        declarations.append((m.end(), declared_type))
+    return declarations
+
+def declaration_at(declarations, pos):
+    """Type of the nearest expectedResponse declared before pos, or None if unknown"""
+    index = bisect_right(declarations, (pos,)) - 1
+    return declarations[index][1] if index >= 0 else None